@@ -1,20 +1,32 @@
 const { Client } = require('pg');
-const AWS = require('aws-sdk');
+const { SecretsManagerClient, GetSecretValueCommand } = require('@aws-sdk/client-secrets-manager');
 
-// Initialize AWS services
-const secretsManager = new AWS.SecretsManager();
+// Initialize AWS services (SDK v3 keeps HTTPS connections alive by default)
+const secretsManager = new SecretsManagerClient({});
+
+// Full event payloads are only logged when LOG_LEVEL is set to debug
+const DEBUG_LOGGING = (process.env.LOG_LEVEL || '').toLowerCase() === 'debug';
 
 // Helper for logging with timestamps
 const logWithTimestamp = (message) => {
   console.log(`[${new Date().toISOString()}] ${message}`);
 };
 
-// Get database credentials from Secrets Manager
+// Database credentials cached across warm invocations until they expire
+const CREDENTIALS_TTL_MS = 15 * 60 * 1000;
+let cachedCredentials = null;
+let credentialsExpireAt = 0;
+
+// Get database credentials from Secrets Manager, cached for CREDENTIALS_TTL_MS
 async function getDatabaseCredentials() {
+  if (cachedCredentials && Date.now() < credentialsExpireAt) {
+    return cachedCredentials;
+  }
+  
   try {
-    const secretData = await secretsManager.getSecretValue({ 
-      SecretId: process.env.DB_SECRET_ARN 
-    }).promise();
+    const secretData = await secretsManager.send(new GetSecretValueCommand({
+      SecretId: process.env.DB_SECRET_ARN
+    }));
     
     let credentials;
     try {
@@ -30,6 +42,9 @@ async function getDatabaseCredentials() {
       };
     }
     
+    cachedCredentials = credentials;
+    credentialsExpireAt = Date.now() + CREDENTIALS_TTL_MS;
+    
     return credentials;
   } catch (error) {
     logWithTimestamp(`Failed to retrieve database credentials: ${error.message}`);
@@ -37,60 +52,173 @@ async function getDatabaseCredentials() {
   }
 }
 
-// Query course details from database
-async function getCourseDetails(courseIdentifier, identifierType = 'id') {
+// Database client reused across warm invocations
+let dbClient = null;
+
+// Connection attempt in progress, shared by concurrent callers
+let dbConnecting = null;
+
+// Set while the cold-start warm-up connection is being opened
+let warmingUp = false;
+
+// Get a connected database client, connecting on first use
+async function getDatabaseClient() {
+  if (dbClient) {
+    return dbClient;
+  }
+  
+  if (!dbConnecting) {
+    dbConnecting = connectDatabaseClient().finally(() => {
+      dbConnecting = null;
+    });
+  }
+  return dbConnecting;
+}
+
+// Open a new database connection and cache it for reuse
+async function connectDatabaseClient() {
+  // Get database credentials
+  const credentials = await getDatabaseCredentials();
+  
+  // Connect to the database
+  const client = new Client({
+    user: credentials.user || 'dbadmin',
+    password: credentials.password,
+    host: credentials.host || process.env.DB_HOST,
+    database: credentials.database || process.env.DB_NAME,
+    port: credentials.port || 5432,
+    connectionTimeoutMillis: 10000,
+    query_timeout: 30000,
+    keepAlive: true
+  });
+  
+  // Drop the cached client if the connection is lost while idle
+  client.on('error', (error) => {
+    logWithTimestamp(`Database connection error: ${error.message}`);
+    if (dbClient === client) {
+      dbClient = null;
+    }
+  });
+  
+  try {
+    await client.connect();
+  } catch (error) {
+    // The password may have been rotated, so fetch it again next time
+    cachedCredentials = null;
+    throw error;
+  }
+  logWithTimestamp('Connected to the database');
+  
+  dbClient = client;
+  return client;
+}
+
+// Forget a broken database client so the next query reconnects. Closing it is
+// best effort and not awaited, since a half-open socket may never finish ending.
+function discardDatabaseClient(client) {
+  if (dbClient === client) {
+    dbClient = null;
+  }
+  client.end().catch((error) => {
+    logWithTimestamp(`Error closing database connection: ${error.message}`);
+  });
+}
+
+// Whether an error means the cached client can no longer be used. Errors the
+// server reports for a statement carry a SQLSTATE code; terminated connections,
+// socket errors and query timeouts do not. SQLSTATE classes 08 (connection
+// exception) and 57P (server shutdown) also mean the connection is gone, and
+// 0A000 means a schema change invalidated a prepared statement's cached plan,
+// which only a new connection clears.
+function shouldReconnect(error) {
+  const code = typeof error.code === 'string' ? error.code : '';
+  const isSqlState = /^[0-9A-Z]{5}$/.test(code) && /[0-9]/.test(code);
+  return !isSqlState || /^(08|57P)/.test(code) || code === '0A000';
+}
+
+// Whether a query was cancelled by the client's query_timeout
+function isQueryTimeout(error) {
+  return error.message === 'Query read timeout';
+}
+
+// Run a query on the cached client. A reused connection may have died while the
+// container was frozen, so on a connection error retry once on a new connection.
+async function runQuery(queryConfig, canRetry = true) {
+  // A connection kept from an earlier invocation, or one the cold-start warm-up
+  // was opening when the sandbox was frozen, may be dead by the time it is used
+  const mayBeStale = canRetry && (dbClient !== null || warmingUp);
+  
   let client;
   try {
-    // Get database credentials
-    const credentials = await getDatabaseCredentials();
-    
-    // Connect to the database
-    client = new Client({
-      user: credentials.user || 'dbadmin',
-      password: credentials.password,
-      host: credentials.host || process.env.DB_HOST,
-      database: credentials.database || process.env.DB_NAME,
-      port: credentials.port || 5432,
-      connectionTimeoutMillis: 10000
-    });
+    client = await getDatabaseClient();
+  } catch (error) {
+    // A failed connect is only retried if this call joined the warm-up's connect
+    if (!mayBeStale) {
+      throw error;
+    }
+    logWithTimestamp(`Warm-up database connection failed, reconnecting: ${error.message}`);
+    return runQuery(queryConfig, false);
+  }
+  
+  try {
+    return await client.query(queryConfig);
+  } catch (error) {
+    if (!shouldReconnect(error)) {
+      throw error;
+    }
     
-    await client.connect();
-    logWithTimestamp('Connected to the database');
+    // A timed-out query is not retried: the database is already slow, and a
+    // second attempt would double both the load and the caller's wait
+    discardDatabaseClient(client);
+    if (!mayBeStale || isQueryTimeout(error)) {
+      throw error;
+    }
     
+    logWithTimestamp(`Reused database connection failed, reconnecting: ${error.message}`);
+    return runQuery(queryConfig, false);
+  }
+}
+
+// Course details query, looking the course up by the given column
+const courseDetailsQuery = (column) => `
+  SELECT c.*,
+         array_agg(DISTINCT p.program_name) as programs,
+         COUNT(DISTINCT sce.student_id) as enrolled_students
+  FROM courses c
+  LEFT JOIN program_courses pc ON c.course_id = pc.course_id
+  LEFT JOIN programs p ON pc.program_id = p.program_id
+  LEFT JOIN student_course_enrollment sce ON c.course_id = sce.course_id
+  WHERE c.${column} = $1
+  GROUP BY c.course_id
+`;
+
+// Named so Postgres parses and plans them once per connection
+const COURSE_BY_CODE_QUERY = {
+  name: 'course-details-by-code',
+  text: courseDetailsQuery('course_code')
+};
+const COURSE_BY_ID_QUERY = {
+  name: 'course-details-by-id',
+  text: courseDetailsQuery('course_id')
+};
+
+// Query course details from database
+async function getCourseDetails(courseIdentifier, identifierType = 'id') {
+  try {
     // Determine query based on identifier type
     let query;
     let params;
     
     if (identifierType === 'code') {
-      query = `
-        SELECT c.*, 
-               array_agg(DISTINCT p.program_name) as programs,
-               COUNT(DISTINCT sce.student_id) as enrolled_students
-        FROM courses c
-        LEFT JOIN program_courses pc ON c.course_id = pc.course_id
-        LEFT JOIN programs p ON pc.program_id = p.program_id
-        LEFT JOIN student_course_enrollment sce ON c.course_id = sce.course_id
-        WHERE c.course_code = $1
-        GROUP BY c.course_id
-      `;
+      query = COURSE_BY_CODE_QUERY;
       params = [courseIdentifier];
     } else {
-      query = `
-        SELECT c.*,
-               array_agg(DISTINCT p.program_name) as programs,
-               COUNT(DISTINCT sce.student_id) as enrolled_students
-        FROM courses c
-        LEFT JOIN program_courses pc ON c.course_id = pc.course_id
-        LEFT JOIN programs p ON pc.program_id = p.program_id
-        LEFT JOIN student_course_enrollment sce ON c.course_id = sce.course_id
-        WHERE c.course_id = $1
-        GROUP BY c.course_id
-      `;
+      query = COURSE_BY_ID_QUERY;
       params = [parseInt(courseIdentifier)];
     }
     
-    // Execute query
-    const result = await client.query(query, params);
+    // Execute query as a named prepared statement
+    const result = await runQuery({ ...query, values: params });
     
     if (result.rows.length === 0) {
       return { found: false, message: 'Course not found' };
@@ -104,18 +232,15 @@ async function getCourseDetails(courseIdentifier, identifierType = 'id') {
   } catch (error) {
     logWithTimestamp(`Error retrieving course details: ${error.message}`);
     throw error;
-  } finally {
-    if (client) {
-      await client.end();
-      logWithTimestamp('Database connection closed');
-    }
   }
 }
 
 // Lambda handler
 exports.handler = async (event) => {
   try {
-    logWithTimestamp('Received event: ' + JSON.stringify(event));
+    if (DEBUG_LOGGING) {
+      logWithTimestamp('Received event: ' + JSON.stringify(event));
+    }
     
     // Check if this is an EventBridge event
     if (event.source === 'course.query.service' && 
@@ -159,4 +284,14 @@ exports.handler = async (event) => {
       body: JSON.stringify({ error: 'Internal server error' })
     };
   }
-};
\ No newline at end of file
+};
+
+// Connect during cold-start init so the first invocation finds a warm connection.
+// If that connection, or the connect itself if the sandbox was frozen mid-way,
+// has failed by the first query, runQuery reconnects and retries once.
+warmingUp = true;
+getDatabaseClient().catch((error) => {
+  logWithTimestamp(`Database warm-up failed: ${error.message}`);
+}).finally(() => {
+  warmingUp = false;
+});
@@ -1,16 +1,58 @@
 const { Client } = require('pg');
-const AWS = require('aws-sdk');
+const { SecretsManagerClient, GetSecretValueCommand } = require('@aws-sdk/client-secrets-manager');
 
-// Initialize AWS clients
-const secretsManager = new AWS.SecretsManager();
+// Initialize AWS clients (SDK v3 keeps HTTPS connections alive by default)
+const secretsManager = new SecretsManagerClient({});
+
+// Full event payloads are only logged when LOG_LEVEL is set to debug
+const DEBUG_LOGGING = (process.env.LOG_LEVEL || '').toLowerCase() === 'debug';
+
+// Database client reused across warm invocations
+let dbClient = null;
+
+// Connection attempt in progress, shared by concurrent callers
+let dbConnecting = null;
+
+// Set while the cold-start warm-up connection is being opened
+let warmingUp = false;
+
+// Database configuration cached across warm invocations until it expires
+const DB_CONFIG_TTL_MS = 15 * 60 * 1000;
+let cachedDbConfig = null;
+let dbConfigExpiresAt = 0;
+
+// Query that gets program information for a student based on the actual schema,
+// named so Postgres parses and plans it once per connection
+const PROGRAM_DETAILS_QUERY = {
+  name: 'program-details-by-student',
+  text: `
+    SELECT 
+      p.program_id,
+      p.program_name,
+      p.director,
+      e.gpa,
+      e.enrollment_status,
+      e.start_date
+    FROM 
+      enrollments e
+    JOIN 
+      programs p ON e.program_id = p.program_id
+    WHERE 
+      e.student_id = $1
+    ORDER BY 
+      e.start_date DESC
+    LIMIT 1
+  `
+};
 
 /**
  * Lambda handler for ProgramDetails 
  * Processes GetProgramDetails events from EventBridge
  */
 exports.handler = async (event, context) => {
-  console.log('Received event:', JSON.stringify(event, null, 2));
-  let client = null;
+  if (DEBUG_LOGGING) {
+    console.log('Received event:', JSON.stringify(event, null, 2));
+  }
   
   try {
     // Extract studentId from event
@@ -20,16 +62,8 @@ exports.handler = async (event, context) => {
       throw new Error('Student ID is required');
     }
     
-    // Get database credentials and create connection
-    const dbConfig = await getDatabaseConfig();
-    client = new Client(dbConfig);
-    
-    console.log('Connecting to database...');
-    await client.connect();
-    console.log('Connected successfully to database');
-    
     // Query program details for the student
-    const programDetails = await queryProgramDetails(client, studentId);
+    const programDetails = await queryProgramDetails(studentId);
     
     return {
       statusCode: 200,
@@ -46,39 +80,158 @@ exports.handler = async (event, context) => {
       statusCode: 500,
       body: JSON.stringify({ error: error.message })
     };
-  } finally {
-    if (client) {
-      try {
-        await client.end();
-        console.log('Database connection closed');
-      } catch (err) {
-        console.error('Error closing database connection:', err);
-      }
-    }
   }
 };
 
 /**
- * Get database configuration using secrets manager
+ * Get a connected database client, reusing it across warm invocations
+ */
+async function getDatabaseClient() {
+  if (dbClient) {
+    return dbClient;
+  }
+  
+  if (!dbConnecting) {
+    dbConnecting = connectDatabaseClient().finally(() => {
+      dbConnecting = null;
+    });
+  }
+  return dbConnecting;
+}
+
+/**
+ * Open a new database connection and cache it for reuse
+ */
+async function connectDatabaseClient() {
+  // Get database credentials and create connection
+  const dbConfig = await getDatabaseConfig();
+  const client = new Client(dbConfig);
+  
+  // Drop the cached client if the connection is lost while idle
+  client.on('error', (err) => {
+    console.error('Database connection error:', err);
+    if (dbClient === client) {
+      dbClient = null;
+    }
+  });
+  
+  console.log('Connecting to database...');
+  try {
+    await client.connect();
+  } catch (err) {
+    // The password may have been rotated, so fetch it again next time
+    cachedDbConfig = null;
+    throw err;
+  }
+  console.log('Connected successfully to database');
+  
+  dbClient = client;
+  return client;
+}
+
+/**
+ * Forget a broken database client so the next query reconnects. Closing it is
+ * best effort and not awaited, since a half-open socket may never finish ending.
+ */
+function discardDatabaseClient(client) {
+  if (dbClient === client) {
+    dbClient = null;
+  }
+  client.end().catch((err) => {
+    console.error('Error closing database connection:', err);
+  });
+}
+
+/**
+ * Whether an error means the cached client can no longer be used. Errors the
+ * server reports for a statement carry a SQLSTATE code; terminated connections,
+ * socket errors and query timeouts do not. SQLSTATE classes 08 (connection
+ * exception) and 57P (server shutdown) also mean the connection is gone, and
+ * 0A000 means a schema change invalidated a prepared statement's cached plan,
+ * which only a new connection clears.
+ */
+function shouldReconnect(error) {
+  const code = typeof error.code === 'string' ? error.code : '';
+  const isSqlState = /^[0-9A-Z]{5}$/.test(code) && /[0-9]/.test(code);
+  return !isSqlState || /^(08|57P)/.test(code) || code === '0A000';
+}
+
+/**
+ * Whether a query was cancelled by the client's query_timeout
+ */
+function isQueryTimeout(error) {
+  return error.message === 'Query read timeout';
+}
+
+/**
+ * Run a query on the cached client. A reused connection may have died while the
+ * container was frozen, so on a connection error retry once on a new connection.
+ */
+async function runQuery(queryConfig, canRetry = true) {
+  // A connection kept from an earlier invocation, or one the cold-start warm-up
+  // was opening when the sandbox was frozen, may be dead by the time it is used
+  const mayBeStale = canRetry && (dbClient !== null || warmingUp);
+  
+  let client;
+  try {
+    client = await getDatabaseClient();
+  } catch (error) {
+    // A failed connect is only retried if this call joined the warm-up's connect
+    if (!mayBeStale) {
+      throw error;
+    }
+    console.log('Warm-up database connection failed, reconnecting:', error.message);
+    return runQuery(queryConfig, false);
+  }
+  
+  try {
+    return await client.query(queryConfig);
+  } catch (error) {
+    if (!shouldReconnect(error)) {
+      throw error;
+    }
+    
+    // A timed-out query is not retried: the database is already slow, and a
+    // second attempt would double both the load and the caller's wait
+    discardDatabaseClient(client);
+    if (!mayBeStale || isQueryTimeout(error)) {
+      throw error;
+    }
+    
+    console.log('Reused database connection failed, reconnecting:', error.message);
+    return runQuery(queryConfig, false);
+  }
+}
+
+/**
+ * Get database configuration using secrets manager, cached for DB_CONFIG_TTL_MS
  */
 async function getDatabaseConfig() {
+  if (cachedDbConfig && Date.now() < dbConfigExpiresAt) {
+    return cachedDbConfig;
+  }
+  
   try {
     // Get database password from Secrets Manager
-    const { SecretString } = await secretsManager.getSecretValue({
+    const { SecretString } = await secretsManager.send(new GetSecretValueCommand({
       SecretId: process.env.DB_SECRET_ARN
-    }).promise();
+    }));
     
     console.log('Retrieved database credentials');
     
-    return {
+    cachedDbConfig = {
       host: process.env.DB_HOST,
       database: process.env.DB_NAME,
       user: 'dbadmin',
       password: SecretString,
       port: 5432,
       connectionTimeoutMillis: 10000,
-      query_timeout: 30000
+      query_timeout: 30000,
+      keepAlive: true
     };
+    dbConfigExpiresAt = Date.now() + DB_CONFIG_TTL_MS;
+    
+    return cachedDbConfig;
   } catch (error) {
     console.error('Error retrieving database credentials:', error);
     throw new Error(`Failed to get database credentials: ${error.message}`);
@@ -88,31 +241,12 @@ async function getDatabaseConfig() {
 /**
  * Query database for program details
  */
-async function queryProgramDetails(client, studentId) {
+async function queryProgramDetails(studentId) {
   try {
     console.log(`Querying program details for student: ${studentId}`);
     
-    // Query that gets program information for a student based on the actual schema
-    const query = `
-      SELECT 
-        p.program_id,
-        p.program_name,
-        p.director,
-        e.gpa,
-        e.enrollment_status,
-        e.start_date
-      FROM 
-        enrollments e
-      JOIN 
-        programs p ON e.program_id = p.program_id
-      WHERE 
-        e.student_id = $1
-      ORDER BY 
-        e.start_date DESC
-      LIMIT 1
-    `;
-    
-    const result = await client.query(query, [studentId]);
+    // Execute as a named prepared statement
+    const result = await runQuery({ ...PROGRAM_DETAILS_QUERY, values: [studentId] });
     
     if (result.rows.length === 0) {
       return { message: 'No program details found for this student' };
@@ -123,4 +257,14 @@ async function queryProgramDetails(client, studentId) {
     console.error('Database query error:', error);
     throw new Error(`Database query failed: ${error.message}`);
   }
-}
\ No newline at end of file
+}
+
+// Connect during cold-start init so the first invocation finds a warm connection.
+// If that connection, or the connect itself if the sandbox was frozen mid-way,
+// has failed by the first query, runQuery reconnects and retries once.
+warmingUp = true;
+getDatabaseClient().catch((err) => {
+  console.error('Database warm-up failed:', err.message);
+}).finally(() => {
+  warmingUp = false;
+});
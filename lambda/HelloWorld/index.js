@@ -1,13 +1,18 @@
+// Response is constant, so build it once at module load
+const HEADERS = {
+  "Access-Control-Allow-Origin": "*", // Enable CORS
+  "Access-Control-Allow-Headers": "Content-Type",
+  "Access-Control-Allow-Methods": "GET",
+};
+
+const BODY = JSON.stringify({
+  message: "Hello World",
+});
+
 exports.handler = async (event) => {
   return {
     statusCode: 200,
-    headers: {
-      "Access-Control-Allow-Origin": "*", // Enable CORS
-      "Access-Control-Allow-Headers": "Content-Type",
-      "Access-Control-Allow-Methods": "GET",
-    },
-    body: JSON.stringify({
-      message: "Hello World",
-    }),
+    headers: HEADERS,
+    body: BODY,
   };
 };